@@ -2,12 +2,46 @@
 
 from cuda_lint import Linter
 import os
-import shutil
-import json
+import re
+from itertools import chain
 from cudatext import *
+# json and shutil are imported lazily where used
 
-# Plugin loaded (lazy loading via CudaLint framework)
-print("ShellCheck: Plugin initialized")
+# Verbose console output (set SHELLCHECK_DEBUG=1)
+_DEBUG = bool(os.environ.get('SHELLCHECK_DEBUG'))
+
+def _log(msg):
+    """Print status message only in debug mode (NOTE:/ERROR: are always printed)."""
+    if _DEBUG:
+        print(msg)
+
+_log("ShellCheck: Plugin initialized")
+
+# Bundled executable: <CudaText>/tools/ShellCheck (plugin lives in <CudaText>/py/<plugin>)
+_BUNDLED_EXE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    'tools', 'ShellCheck', 'shellcheck.exe' if os.name == 'nt' else 'shellcheck'
+)
+
+# Whole-line // and # comments in config file
+_COMMENT_RE = re.compile(r'(?m)^\s*(?://|#).*$')
+
+# Valid ignore code: 'SC' followed by digits
+_SC_RE = re.compile(r'SC\d+')
+
+# ShellCheck GCC format: filename:line:col: type: message (CRLF-safe on Windows)
+_OUTPUT_RE = re.compile(
+    r'^.+:(?P<line>\d+):(?P<col>\d+): '
+    r'(?:(?P<error>error)|(?P<warning>warning|note)): '
+    r'(?P<message>[^\r\n]+)',
+    re.MULTILINE
+)
+
+# Dialects ShellCheck infers from file extension (lost when piping to stdin)
+_SHELL_BY_EXT = {'.bash': 'bash', '.bats': 'bash', '.dash': 'dash', '.ksh': 'ksh'}
+
+# '# shellcheck shell=...' directive in source
+_SHELL_DIRECTIVE_RE = re.compile(r'(?m)^\s*#\s*shellcheck\s.*\bshell=')
 
 class ShellCheck(Linter):
     """ShellCheck linter interface for CudaLint framework.
@@ -24,14 +58,15 @@ class ShellCheck(Linter):
     cmd = ('shellcheck', '-f', 'gcc', '-')
 
     # Regex for ShellCheck GCC format: filename:line:col: type: message
-    regex = (
-        r'^.+:(?P<line>\d+):(?P<col>\d+): '
-        r'(?:(?P<error>error)|(?P<warning>warning|note)): '
-        r'(?P<message>.+)'
-    )
+    # (precompiled; multiline lets CudaLint walk the whole output with finditer)
+    regex = _OUTPUT_RE
+    multiline = True
+    tempfile_suffix = None  # CudaLint pipes source to stdin ('-' in cmd)
 
-    multiline = False
-    tempfile_suffix = 'sh'
+    # Shared between instances (one per opened Bash buffer)
+    _exec_cache = None
+    _config_cache = None  # (mtime, ignore_codes, cmd)
+    _loads_cache = None
 
     def __init__(self, view):
         super().__init__(view)
@@ -43,42 +78,63 @@ class ShellCheck(Linter):
             self.ignore_codes = []
             return
 
+        self.executable = self.shellcheck_path
+
+        # Reuse parsed config and command while config file is unchanged
+        mtime = self._config_mtime()
+        if (cache := ShellCheck._config_cache) and cache[0] == mtime:
+            _, self.ignore_codes, self.cmd = cache
+            return
+
         # Load ignore configuration
         self.ignore_codes = self._load_config()
 
         # Update with actual values
-        self.executable = self.shellcheck_path
         self.cmd = self._build_cmd()
+        ShellCheck._config_cache = (mtime, self.ignore_codes, self.cmd)
 
         # Show diagnostic information
         self._log_status()
 
+    @classmethod
+    def _config_path(cls):
+        """Full path of the JSON config in the settings folder."""
+        return os.path.join(app_path(APP_DIR_SETTINGS), cls.CONFIG_FILE)
+
+    @classmethod
+    def _config_mtime(cls):
+        """Modification time of the config file, or None if missing."""
+        try:
+            return os.stat(cls._config_path()).st_mtime
+        except OSError:
+            return None
+
     def _find_executable(self):
         """Locate ShellCheck: system PATH first, then bundled version."""
+        # Guard clause: already located by a previous instance
+        if ShellCheck._exec_cache:
+            return ShellCheck._exec_cache
+
+        import shutil
+
         # Try system PATH (cross-platform)
         if path := shutil.which('shellcheck'):
-            print(f"ShellCheck: Found in PATH: {path}")
+            _log(f"ShellCheck: Found in PATH: {path}")
+            ShellCheck._exec_cache = path
             return path
 
         # Try bundled version
-        try:
-            base = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-            exe = 'shellcheck.exe' if os.name == 'nt' else 'shellcheck'
-            bundled = os.path.join(base, 'tools', 'ShellCheck', exe)
-
-            if os.path.isfile(bundled):
-                print(f"ShellCheck: Using bundled version: {bundled}")
-                return bundled
-
-            print(f"NOTE: ShellCheck not found in PATH or: {bundled}")
-        except (NameError, AttributeError) as e:
-            print(f"NOTE: Cannot locate bundled ShellCheck: {e}")
+        if os.path.isfile(_BUNDLED_EXE):
+            _log(f"ShellCheck: Using bundled version: {_BUNDLED_EXE}")
+            ShellCheck._exec_cache = _BUNDLED_EXE
+            return _BUNDLED_EXE
 
+        print(f"NOTE: ShellCheck not found in PATH or: {_BUNDLED_EXE}")
         return None
 
     def _load_config(self):
         """Load ignore codes from JSON config, supporting comments."""
-        path = os.path.join(app_path(APP_DIR_SETTINGS), self.CONFIG_FILE)
+        path = self._config_path()
 
         # Guard clause: config file doesn't exist
         if not os.path.isfile(path):
@@ -93,31 +149,37 @@ class ShellCheck(Linter):
         return self._parse_and_validate_codes(content)
 
     def _read_config_file(self, path):
-        """Read config file with comment stripping and encoding fallback."""
+        """Read config file with comment stripping (UTF-8, bad bytes replaced)."""
         try:
-            # Try UTF-8 first (standard)
-            with open(path, 'r', encoding='utf-8') as f:
-                lines = [ln for ln in f if (stripped := ln.strip()) and not stripped.startswith(('//', '#'))]
-                return ''.join(lines).strip()
-
-        except UnicodeDecodeError:
-            # Fallback to system default encoding (legacy Windows, etc)
-            try:
-                with open(path, 'r') as f:
-                    lines = [ln for ln in f if (stripped := ln.strip()) and not stripped.startswith(('//', '#'))]
-                    return ''.join(lines).strip()
-            except Exception as e:
-                print(f"ERROR: Failed to read ShellCheck config with fallback encoding: {e}")
-                return None
+            with open(path, 'rb') as f:
+                text = f.read().decode('utf-8', 'replace')
+            return _COMMENT_RE.sub('', text).strip()
 
         except Exception as e:
             print(f"ERROR: Failed to read ShellCheck config: {e}")
             return None
 
+    @staticmethod
+    def _json_loads():
+        """JSON parser: orjson when installed (its JSONDecodeError subclasses json's), else stdlib."""
+        # Guard clause: resolved once, failed imports are not cached by Python
+        if ShellCheck._loads_cache:
+            return ShellCheck._loads_cache
+
+        try:
+            from orjson import loads
+        except ImportError:
+            from json import loads
+
+        ShellCheck._loads_cache = loads
+        return loads
+
     def _parse_and_validate_codes(self, content):
         """Parse JSON and validate SC code format."""
+        import json
+
         try:
-            config = json.loads(content)
+            config = self._json_loads()(content)
 
             # Guard clause: config must be a dict (JSON object)
             if not isinstance(config, dict):
@@ -132,16 +194,17 @@ class ShellCheck(Linter):
                 return []
 
             # Validate format: must be string starting with 'SC' followed by digits
-            valid = [c for c in codes if isinstance(c, str) and c.startswith('SC') and c[2:].isdigit()]
+            # (duplicates dropped, first occurrence order kept)
+            valid = list(dict.fromkeys(c for c in codes if isinstance(c, str) and _SC_RE.fullmatch(c)))
 
             # Warn about invalid codes
-            if len(valid) != len(codes):
-                invalid = [c for c in codes if c not in valid]
+            valid_set = set(valid)
+            if invalid := [c for c in codes if not (isinstance(c, str) and c in valid_set)]:
                 print(f"NOTE: ShellCheck - Invalid codes ignored: {invalid}")
 
             # Log loaded codes
             if valid:
-                print(f"ShellCheck: Loaded ignore codes: {valid}")
+                _log(f"ShellCheck: Loaded ignore codes: {valid}")
 
             return valid
 
@@ -151,25 +214,39 @@ class ShellCheck(Linter):
 
     def _build_cmd(self):
         """Build command with ignore flags."""
-        cmd = [self.shellcheck_path, '-f', 'gcc', '-']
-
-        for code in self.ignore_codes:
-            cmd.extend(['-e', code])
+        cmd = (
+            self.shellcheck_path, '-f', 'gcc', '-',
+            *chain.from_iterable(('-e', code) for code in self.ignore_codes),
+        )
 
-        print(f"ShellCheck: Command: {' '.join(cmd)}")
-        return tuple(cmd)
+        _log(f"ShellCheck: Command: {' '.join(cmd)}")
+        return cmd
 
     def _log_status(self):
-        """Print diagnostic information."""
+        """Print diagnostic information (debug mode only)."""
         count = len(self.ignore_codes)
-        print(f"ShellCheck: Active with {count} ignore rule{'s' if count != 1 else ''}")
+        _log(f"ShellCheck: Active with {count} ignore rule{'s' if count != 1 else ''}")
         if self.ignore_codes:
-            print(f"ShellCheck: Ignoring: {', '.join(self.ignore_codes)}")
+            _log(f"ShellCheck: Ignoring: {', '.join(self.ignore_codes)}")
+
+    def run(self, cmd, code):
+        """Pipe source to ShellCheck via CudaLint, with dialect flag if needed."""
+        return super().run(self._with_dialect(cmd, code), code)
 
-    def tmpfile(self, cmd, code, suffix=''):
-        """Ensure .sh extension for proper ShellCheck detection."""
-        _, ext = os.path.splitext(self.filename)
-        return super().tmpfile(cmd, code, ext or '.sh')
+    def _with_dialect(self, cmd, code):
+        """Add '-s <dialect>' from file extension, as stdin has no file name.
+
+        Skipped when source has a shebang or '# shellcheck shell=' directive,
+        since '-s' would override them.
+        """
+        _, ext = os.path.splitext(self.filename or '')
+        shell = _SHELL_BY_EXT.get(ext.lower())
+
+        # Guard clause: ShellCheck can detect dialect from source itself
+        if not shell or code.startswith('#!') or _SHELL_DIRECTIVE_RE.search(code):
+            return cmd
+
+        return [*cmd, '-s', shell]
 
     def _get_shellcheck_version(self):
         """Get ShellCheck version for diagnostics."""
@@ -197,23 +274,29 @@ class ShellCheck(Linter):
 class Command:
     """Menu commands for ShellCheck plugin."""
 
-    DEFAULT_CONFIG = {
-        "ignore_codes": [
-            "SC2034",  # unused variable
-            "SC2154",  # referenced but not assigned
-            "SC2086"   # quote to prevent word splitting
-        ]
-    }
+    # Written verbatim on first config(); whole-line comments are supported by the reader
+    _DEFAULT_CONFIG_BYTES = (
+        b'{\n'
+        b'  "ignore_codes": [\n'
+        b'    // unused variable\n'
+        b'    "SC2034",\n'
+        b'    // referenced but not assigned\n'
+        b'    "SC2154",\n'
+        b'    // quote to prevent word splitting\n'
+        b'    "SC2086"\n'
+        b'  ]\n'
+        b'}\n'
+    )
 
     def config(self):
         """Open/create configuration file."""
-        path = os.path.join(app_path(APP_DIR_SETTINGS), ShellCheck.CONFIG_FILE)
+        path = ShellCheck._config_path()
 
         if not os.path.isfile(path):
             try:
                 os.makedirs(os.path.dirname(path), exist_ok=True)
-                with open(path, 'w', encoding='utf-8') as f:
-                    json.dump(self.DEFAULT_CONFIG, f, indent=2)
+                with open(path, 'wb') as f:
+                    f.write(self._DEFAULT_CONFIG_BYTES)
                 print(f"ShellCheck: Created default config: {path}")
             except Exception as e:
                 msg_box(f"Failed to create config:\n{e}", MB_OK | MB_ICONERROR)
@@ -240,7 +323,7 @@ class Command:
             "- Auto-detection (PATH -> bundled)\n"
             "- Configurable ignore rules (JSON)\n"
             "- Multi-platform support\n"
-            "- Diagnostic logging\n\n"
+            "- Diagnostic logging (set SHELLCHECK_DEBUG=1)\n\n"
             "CONFIGURATION:\n"
             "Access via: Options > Settings-plugins > ShellCheck > Config\n"
             "Supports // and # comments in JSON file\n\n"